@@ -0,0 +1,120 @@
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from typing import Iterator, Optional, TextIO
+
+
+DEFAULT_SPILL_BYTES = 64 * 1024
+DEFAULT_PREVIEW_CHARS = 500
+CHUNK_SIZE = 64 * 1024
+
+_store_dir: Optional[str] = None
+
+
+def get_store_dir() -> str:
+    global _store_dir
+    if _store_dir is None:
+        _store_dir = tempfile.mkdtemp(prefix="chatlist-blobs-")
+    return _store_dir
+
+
+def make_preview(text: str, limit: int = DEFAULT_PREVIEW_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + "…"
+
+
+def get_blob_path(key: str) -> str:
+    return os.path.join(get_store_dir(), key[:2], key[2:])
+
+
+def store_bytes(data: bytes) -> str:
+    key = hashlib.sha256(data).hexdigest()
+    path = get_blob_path(key)
+    if os.path.exists(path):
+        return key
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+    return key
+
+
+def spill_if_large(text: str, spill_bytes: int = DEFAULT_SPILL_BYTES) -> Optional[str]:
+    data = text.encode("utf-8")
+    if len(data) < spill_bytes:
+        return None
+    return store_bytes(data)
+
+
+def read_text(key: str) -> str:
+    with open(get_blob_path(key), "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return str(view, "utf-8")
+
+
+def _iter_text_chunks(key: str) -> Iterator[str]:
+    with open(get_blob_path(key), "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, size, CHUNK_SIZE):
+                yield decoder.decode(mapped[offset : offset + CHUNK_SIZE])
+        yield decoder.decode(b"", final=True)
+
+
+def write_text_to(key: str, target: TextIO) -> None:
+    for chunk in _iter_text_chunks(key):
+        target.write(chunk)
+
+
+def write_json_string_to(key: str, target: TextIO) -> None:
+    target.write('"')
+    for chunk in _iter_text_chunks(key):
+        target.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+    target.write('"')
+
+
+def contains(key: str, query: str) -> bool:
+    query = query.lower()
+    if not query:
+        return True
+    with open(get_blob_path(key), "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped.find(query.encode("utf-8")) != -1:
+                return True
+
+    tail = ""
+    for chunk in _iter_text_chunks(key):
+        window = tail + chunk.lower()
+        if query in window:
+            return True
+        tail = window[-(len(query) - 1) :] if len(query) > 1 else ""
+    return False
+
+
+def delete_blob(key: str) -> None:
+    try:
+        os.remove(get_blob_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def clear_store() -> None:
+    global _store_dir
+    if _store_dir is not None:
+        shutil.rmtree(_store_dir, ignore_errors=True)
+        _store_dir = None
@@ -1,8 +1,19 @@
+import math
+import os
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
 
 
 DB_PATH = "chatlist.db"
+ARCHIVE_DIR = os.path.join(os.path.dirname(DB_PATH), "archive")
+ARCHIVE_PREFIX = "results_"
+ARCHIVE_MONTH_RE = re.compile(r"^\d{4}_\d{2}$")
+DEFAULT_ARCHIVE_AFTER_DAYS = 0
+DEFAULT_ARCHIVE_RETENTION_MONTHS = 0
+VACUUM_FREE_RATIO = 0.25
 
 
 def get_connection() -> sqlite3.Connection:
@@ -122,6 +133,177 @@ def add_result(
         return int(cur.lastrowid)
 
 
+def list_results(
+    limit: int = 100, since: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    query = (
+        "SELECT id, prompt_id, model_id, response_text, created_at FROM {table} "
+        "WHERE created_at >= ? ORDER BY created_at DESC, id DESC LIMIT ?"
+    )
+    lower = since or ""
+    with get_connection() as conn:
+        rows = conn.execute(
+            query.format(table="main.results"), (lower, limit)
+        ).fetchall()
+        results.extend(dict(row) for row in rows)
+        for month in sorted(list_archive_partitions(), reverse=True):
+            if len(results) >= limit:
+                break
+            if since and month < since[:7]:
+                break
+            with _attach_partition(conn, month) as alias:
+                rows = conn.execute(
+                    query.format(table=f"{alias}.results"),
+                    (lower, limit - len(results)),
+                ).fetchall()
+            results.extend(dict(row) for row in rows)
+    return results
+
+
+def get_archive_partition_path(month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{ARCHIVE_PREFIX}{month.replace('-', '_')}.db")
+
+
+def list_archive_partitions() -> List[str]:
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    months = []
+    for name in os.listdir(ARCHIVE_DIR):
+        if not name.startswith(ARCHIVE_PREFIX) or not name.endswith(".db"):
+            continue
+        stem = name[len(ARCHIVE_PREFIX) : -len(".db")]
+        if not ARCHIVE_MONTH_RE.match(stem):
+            continue
+        months.append(stem.replace("_", "-"))
+    return sorted(months)
+
+
+@contextmanager
+def _attach_partition(conn: sqlite3.Connection, month: str) -> Iterator[str]:
+    # ATTACH/DETACH cannot run inside a transaction, so the caller must not
+    # have one open. The block's own writes are committed on exit.
+    if not ARCHIVE_MONTH_RE.match(month.replace("-", "_")):
+        raise ValueError(f"Invalid archive month: {month!r}")
+    if conn.in_transaction:
+        raise RuntimeError("Cannot attach archive partition inside a transaction")
+
+    alias = f"archive_{month.replace('-', '_')}"
+    conn.execute(
+        "ATTACH DATABASE ? AS " + alias, (get_archive_partition_path(month),)
+    )
+    try:
+        yield alias
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE " + alias)
+
+
+def archive_results(older_than_days: Optional[int] = None) -> List[str]:
+    if older_than_days is None:
+        older_than_days = get_int_setting(
+            "archive_after_days", DEFAULT_ARCHIVE_AFTER_DAYS
+        )
+    if older_than_days <= 0:
+        return []
+
+    cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+    written = []
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with get_connection() as conn:
+        months = [
+            row["month"]
+            for row in conn.execute(
+                "SELECT DISTINCT substr(created_at, 1, 7) AS month FROM results "
+                "WHERE created_at < ? ORDER BY month",
+                (cutoff,),
+            ).fetchall()
+            if ARCHIVE_MONTH_RE.match(row["month"].replace("-", "_"))
+        ]
+        for month in months:
+            with _attach_partition(conn, month) as alias:
+                conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {alias}.results (
+                        id INTEGER PRIMARY KEY,
+                        prompt_id INTEGER NOT NULL,
+                        model_id INTEGER NOT NULL,
+                        response_text TEXT NOT NULL,
+                        created_at TEXT NOT NULL
+                    )
+                    """
+                )
+                params = (cutoff, f"{month}%")
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO {alias}.results
+                        (id, prompt_id, model_id, response_text, created_at)
+                    SELECT id, prompt_id, model_id, response_text, created_at
+                    FROM main.results
+                    WHERE created_at < ? AND created_at LIKE ?
+                    """,
+                    params,
+                )
+                cur = conn.execute(
+                    "DELETE FROM main.results WHERE created_at < ? AND created_at LIKE ?",
+                    params,
+                )
+                if cur.rowcount:
+                    written.append(month)
+    return written
+
+
+def apply_archive_retention(keep_months: Optional[int] = None) -> List[str]:
+    if keep_months is None:
+        keep_months = get_int_setting(
+            "archive_retention_months", DEFAULT_ARCHIVE_RETENTION_MONTHS
+        )
+    if keep_months <= 0:
+        return []
+
+    after_days = get_int_setting("archive_after_days", DEFAULT_ARCHIVE_AFTER_DAYS)
+    keep_months = max(keep_months, math.ceil(after_days / 30))
+
+    now = datetime.utcnow()
+    total = now.year * 12 + now.month - 1 - keep_months
+    oldest_kept = f"{total // 12:04d}-{total % 12 + 1:02d}"
+    dropped = []
+    for month in list_archive_partitions():
+        if month < oldest_kept:
+            os.remove(get_archive_partition_path(month))
+            dropped.append(month)
+    return dropped
+
+
+def _vacuum_if_fragmented(path: str) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_count / page_count >= VACUUM_FREE_RATIO:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def compact_archive(months: List[str]) -> None:
+    for month in months:
+        _vacuum_if_fragmented(get_archive_partition_path(month))
+    _vacuum_if_fragmented(DB_PATH)
+
+
+def run_archive_maintenance() -> List[str]:
+    written = archive_results()
+    dropped = apply_archive_retention()
+    if written:
+        compact_archive([month for month in written if month not in dropped])
+    return written
+
+
 def set_setting(key: str, value: str) -> None:
     with get_connection() as conn:
         conn.execute(
@@ -142,3 +324,18 @@ def get_setting(key: str) -> Optional[str]:
     if not row:
         return None
     return row["value"]
+
+
+def get_int_setting(key: str, default: int) -> int:
+    value = get_setting(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def get_positive_int_setting(key: str, default: int) -> int:
+    value = get_int_setting(key, default)
+    return value if value > 0 else default
@@ -1,13 +1,16 @@
 import json
 import logging
+import sqlite3
 import sys
 from datetime import datetime
 from typing import Dict, List, Optional
 
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QCloseEvent
 from PyQt5.QtWidgets import (
     QApplication,
     QCheckBox,
+    QDialog,
     QFileDialog,
     QFormLayout,
     QHBoxLayout,
@@ -26,6 +29,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+import blobs
 import db
 import models
 import network
@@ -38,6 +42,10 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 900, 600)
 
         db.init_db()
+        try:
+            db.run_archive_maintenance()
+        except (sqlite3.Error, OSError):
+            logging.exception("Archive maintenance failed, skipping")
         self.current_prompt_id: Optional[int] = None
         self.temp_results = []
         self.all_prompts: List[Dict[str, str]] = []
@@ -89,6 +97,7 @@ class MainWindow(QMainWindow):
         self.results_table.setHorizontalHeaderLabels(["Модель", "Ответ", "Selected"])
         self.results_table.horizontalHeader().setStretchLastSection(True)
         self.results_table.setSortingEnabled(True)
+        self.results_table.cellDoubleClicked.connect(self.on_result_double_clicked)
         requests_layout.addWidget(self.results_table)
 
         buttons_layout = QHBoxLayout()
@@ -155,6 +164,23 @@ class MainWindow(QMainWindow):
         model_buttons_layout.addWidget(self.model_refresh_button)
         models_layout.addLayout(model_buttons_layout)
 
+        self.history_tab = QWidget()
+        history_layout = QVBoxLayout()
+        self.history_tab.setLayout(history_layout)
+        self.tabs.addTab(self.history_tab, "История")
+
+        history_layout.addWidget(QLabel("Сохраненные результаты (включая архив):"))
+        self.history_table = QTableWidget(0, 3)
+        self.history_table.setHorizontalHeaderLabels(["Дата", "Модель", "Ответ"])
+        self.history_table.horizontalHeader().setStretchLastSection(True)
+        self.history_table.setSortingEnabled(True)
+        history_layout.addWidget(self.history_table)
+
+        self.history_refresh_button = QPushButton("Обновить список")
+        self.history_refresh_button.clicked.connect(self.load_history)
+        history_layout.addWidget(self.history_refresh_button)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
         self.load_prompts()
         self.load_models()
 
@@ -197,27 +223,46 @@ class MainWindow(QMainWindow):
             self.show_message("Нет активных моделей. Добавьте модели в таблицу models.")
             return
 
-        self.temp_results = []
-        self.results_table.setRowCount(0)
+        self.clear_results()
+        max_bytes = db.get_positive_int_setting(
+            "max_response_bytes", network.DEFAULT_MAX_RESPONSE_BYTES
+        )
+        spill_bytes = db.get_positive_int_setting(
+            "response_spill_bytes", blobs.DEFAULT_SPILL_BYTES
+        )
+        preview_chars = db.get_positive_int_setting(
+            "response_preview_chars", blobs.DEFAULT_PREVIEW_CHARS
+        )
 
         for model in active_models:
             try:
-                response_text = network.send_prompt(model, prompt)
+                response_text = network.send_prompt(model, prompt, max_bytes=max_bytes)
             except network.NetworkError as exc:
                 response_text = f"ERROR: {exc}"
 
+            blob_key = blobs.spill_if_large(response_text, spill_bytes)
+            if blob_key:
+                response_text = blobs.make_preview(response_text, preview_chars)
+
             self.temp_results.append(
                 {
                     "model_id": model.id,
                     "model_name": model.name,
                     "response_text": response_text,
+                    "blob_key": blob_key,
                 }
             )
-            self.add_result_row(model.id, model.name, response_text)
+            self.add_result_row(model.id, model.name, response_text, blob_key)
 
         self.filter_results()
 
-    def add_result_row(self, model_id: int, model_name: str, response_text: str) -> None:
+    def add_result_row(
+        self,
+        model_id: int,
+        model_name: str,
+        response_text: str,
+        blob_key: Optional[str] = None,
+    ) -> None:
         row = self.results_table.rowCount()
         self.results_table.insertRow(row)
 
@@ -227,6 +272,7 @@ class MainWindow(QMainWindow):
         self.results_table.setItem(row, 0, model_item)
 
         response_item = QTableWidgetItem(response_text)
+        response_item.setData(Qt.UserRole, blob_key)
         response_item.setFlags(response_item.flags() & ~Qt.ItemIsEditable)
         self.results_table.setItem(row, 1, response_item)
 
@@ -236,6 +282,42 @@ class MainWindow(QMainWindow):
         selected_item.setFlags(selected_item.flags() & ~Qt.ItemIsEditable)
         self.results_table.setItem(row, 2, selected_item)
 
+    def get_response_text(self, response_item: QTableWidgetItem) -> str:
+        blob_key = response_item.data(Qt.UserRole)
+        if blob_key:
+            return blobs.read_text(blob_key)
+        return response_item.text()
+
+    def on_result_double_clicked(self, row: int, column: int) -> None:
+        if column != 1:
+            return
+        response_item = self.results_table.item(row, 1)
+        if not response_item:
+            return
+        try:
+            response_text = self.get_response_text(response_item)
+        except OSError as exc:
+            self.show_message(f"Не удалось прочитать ответ: {exc}")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Ответ")
+        dialog.resize(700, 500)
+        layout = QVBoxLayout()
+        dialog.setLayout(layout)
+        viewer = QTextEdit()
+        viewer.setReadOnly(True)
+        viewer.setPlainText(response_text)
+        layout.addWidget(viewer)
+        dialog.exec_()
+
+    def clear_results(self) -> None:
+        for result in self.temp_results:
+            if result.get("blob_key"):
+                blobs.delete_blob(result["blob_key"])
+        self.temp_results = []
+        self.results_table.setRowCount(0)
+
     def filter_results(self) -> None:
         query = self.results_search.text().strip().lower()
         for row in range(self.results_table.rowCount()):
@@ -244,7 +326,14 @@ class MainWindow(QMainWindow):
             model_text = model_item.text() if model_item else ""
             response_text = response_item.text() if response_item else ""
             row_text = f"{model_text} {response_text}".lower()
-            self.results_table.setRowHidden(row, bool(query and query not in row_text))
+            matches = not query or query in row_text
+            blob_key = response_item.data(Qt.UserRole) if response_item else None
+            if not matches and blob_key:
+                try:
+                    matches = blobs.contains(blob_key, query)
+                except OSError:
+                    logging.exception("Failed to search spilled response")
+            self.results_table.setRowHidden(row, not matches)
 
     def on_save_clicked(self) -> None:
         if self.current_prompt_id is None:
@@ -262,7 +351,11 @@ class MainWindow(QMainWindow):
                 if not model_item or not response_item:
                     continue
                 model_id = int(model_item.data(Qt.UserRole))
-                response_text = response_item.text()
+                try:
+                    response_text = self.get_response_text(response_item)
+                except OSError as exc:
+                    self.show_message(f"Не удалось прочитать ответ: {exc}")
+                    return
                 db.add_result(self.current_prompt_id, model_id, response_text, created_at)
                 saved_any = True
 
@@ -270,16 +363,14 @@ class MainWindow(QMainWindow):
             self.show_message("Нет выбранных результатов для сохранения.")
             return
 
-        self.temp_results = []
-        self.results_table.setRowCount(0)
+        self.clear_results()
         self.show_message("Выбранные результаты сохранены.")
 
     def on_new_clicked(self) -> None:
         self.prompt_input.clear()
         self.prompts_list.clearSelection()
-        self.results_table.setRowCount(0)
+        self.clear_results()
         self.current_prompt_id = None
-        self.temp_results = []
         self.results_search.clear()
 
     def load_models(self) -> None:
@@ -324,6 +415,35 @@ class MainWindow(QMainWindow):
         is_active = int(active_item.data(Qt.UserRole)) if active_item else 0
         self.model_active_checkbox.setChecked(bool(is_active))
 
+    def on_tab_changed(self, index: int) -> None:
+        if self.tabs.widget(index) is self.history_tab:
+            self.load_history()
+
+    def load_history(self) -> None:
+        try:
+            rows = db.list_results()
+        except (sqlite3.Error, OSError) as exc:
+            logging.exception("Failed to load results history")
+            self.show_message(f"Не удалось загрузить историю: {exc}")
+            return
+
+        model_names = {row["id"]: row["name"] for row in db.list_models()}
+        self.history_table.setSortingEnabled(False)
+        self.history_table.setRowCount(0)
+        for row in rows:
+            table_row = self.history_table.rowCount()
+            self.history_table.insertRow(table_row)
+            values = [
+                row["created_at"],
+                model_names.get(row["model_id"], str(row["model_id"])),
+                blobs.make_preview(row["response_text"]),
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+                self.history_table.setItem(table_row, column, item)
+        self.history_table.setSortingEnabled(True)
+
     def get_selected_model_id(self) -> Optional[int]:
         items = self.models_table.selectedItems()
         if not items:
@@ -383,7 +503,7 @@ class MainWindow(QMainWindow):
         self.load_models()
         self.show_message("Модель удалена.")
 
-    def get_selected_results(self) -> List[Dict[str, str]]:
+    def get_selected_results(self) -> List[Dict[str, Optional[str]]]:
         selected = []
         for row in range(self.results_table.rowCount()):
             selected_item = self.results_table.item(row, 2)
@@ -393,7 +513,11 @@ class MainWindow(QMainWindow):
                 if not model_item or not response_item:
                     continue
                 selected.append(
-                    {"model": model_item.text(), "response": response_item.text()}
+                    {
+                        "model": model_item.text(),
+                        "response": response_item.text(),
+                        "blob_key": response_item.data(Qt.UserRole),
+                    }
                 )
         return selected
 
@@ -410,16 +534,19 @@ class MainWindow(QMainWindow):
             return
 
         prompt_text = self.prompt_input.toPlainText().strip()
-        lines = [f"# Результаты ChatList", "", f"**Промт:** {prompt_text}", ""]
-        for item in selected:
-            lines.append(f"## {item['model']}")
-            lines.append("")
-            lines.append(item["response"])
-            lines.append("")
-        content = "\n".join(lines).strip() + "\n"
-
-        with open(path, "w", encoding="utf-8") as handle:
-            handle.write(content)
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(f"# Результаты ChatList\n\n**Промт:** {prompt_text}\n")
+                for item in selected:
+                    handle.write(f"\n## {item['model']}\n\n")
+                    if item["blob_key"]:
+                        blobs.write_text_to(item["blob_key"], handle)
+                    else:
+                        handle.write(item["response"])
+                    handle.write("\n")
+        except OSError as exc:
+            self.show_message(f"Ошибка экспорта: {exc}")
+            return
 
         self.show_message("Экспорт в Markdown завершен.")
 
@@ -435,15 +562,35 @@ class MainWindow(QMainWindow):
         if not path:
             return
 
-        data = {
-            "prompt": self.prompt_input.toPlainText().strip(),
-            "results": selected,
-        }
-        with open(path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, ensure_ascii=False, indent=2)
+        prompt_text = self.prompt_input.toPlainText().strip()
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write('{"prompt": ')
+                json.dump(prompt_text, handle, ensure_ascii=False)
+                handle.write(', "results": [')
+                for index, item in enumerate(selected):
+                    if index:
+                        handle.write(", ")
+                    handle.write('{"model": ')
+                    json.dump(item["model"], handle, ensure_ascii=False)
+                    handle.write(', "response": ')
+                    if item["blob_key"]:
+                        blobs.write_json_string_to(item["blob_key"], handle)
+                    else:
+                        json.dump(item["response"], handle, ensure_ascii=False)
+                    handle.write("}")
+                handle.write("]}\n")
+        except OSError as exc:
+            self.show_message(f"Ошибка экспорта: {exc}")
+            return
 
         self.show_message("Экспорт в JSON завершен.")
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self.clear_results()
+        blobs.clear_store()
+        super().closeEvent(event)
+
     def show_message(self, text: str) -> None:
         QMessageBox.information(self, "ChatList", text)
 
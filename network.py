@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 from typing import Optional
@@ -11,12 +12,32 @@ from models import ModelConfig
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
 
 class NetworkError(Exception):
     pass
 
 
-def send_prompt(model: ModelConfig, prompt: str, timeout: int = 20) -> str:
+def _read_capped(response: requests.Response, max_bytes: int) -> bytearray:
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise NetworkError(f"Response too large: {length} bytes (limit {max_bytes})")
+
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise NetworkError(f"Response too large: over {max_bytes} bytes")
+    return body
+
+
+def send_prompt(
+    model: ModelConfig,
+    prompt: str,
+    timeout: int = 20,
+    max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+) -> str:
     api_key = os.getenv(model.api_key_env)
     if not api_key:
         raise NetworkError(f"Missing API key in env: {model.api_key_env}")
@@ -35,19 +56,25 @@ def send_prompt(model: ModelConfig, prompt: str, timeout: int = 20) -> str:
     payload = {"prompt": prompt}
 
     try:
-        response = requests.post(
-            model.api_url, json=payload, headers=headers, timeout=timeout
-        )
-        response.raise_for_status()
+        with requests.post(
+            model.api_url, json=payload, headers=headers, timeout=timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            body = _read_capped(response, max_bytes)
     except requests.RequestException as exc:
         logger.error("Network error for model=%s: %s", model.name, exc)
         raise NetworkError(str(exc)) from exc
+    except NetworkError as exc:
+        logger.error("Network error for model=%s: %s", model.name, exc)
+        raise
 
     data: Optional[dict] = None
     try:
-        data = response.json()
+        data = json.loads(body)
     except ValueError:
         data = None
+    if not isinstance(data, dict):
+        data = None
 
     if data and "text" in data:
         return str(data["text"])
@@ -56,4 +83,4 @@ def send_prompt(model: ModelConfig, prompt: str, timeout: int = 20) -> str:
     if data and "choices" in data and data["choices"]:
         return str(data["choices"][0].get("text", "")).strip()
 
-    return response.text.strip()
+    return body.decode(response.encoding or "utf-8", errors="replace").strip()